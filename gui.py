@@ -1,18 +1,152 @@
 import sys
 import os
-import queue
 from PyQt6.QtWidgets import (
-    QWidget, QLabel, QLineEdit, QPushButton, QTextEdit,
+    QApplication, QWidget, QLabel, QLineEdit, QPushButton, QPlainTextEdit,
     QFileDialog, QHBoxLayout, QVBoxLayout, QGridLayout,
     QGroupBox, QSpinBox, QMessageBox, QSystemTrayIcon, QMenu, QStyle
 )
-from PyQt6.QtGui import QPixmap, QIcon, QAction
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QPixmap, QImage, QIcon, QAction, QColor, QPalette
+from PyQt6.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
 
-from utils import find_free_port, find_local_ip, is_port_free, generate_qr_pixmap
+from utils import (
+    find_any_free_port, find_free_port, find_local_ip, is_port_free,
+    QR_SIZE, generate_qr_image, qr_cache_path, save_image_atomic, prune_qr_cache,
+)
 from server_manager import ServerManager
-from logger_thread import ProcessLogger
-import pyperclip
+
+
+DEFAULT_PORT = 8000
+MAX_LOG_BLOCKS = 5000
+
+
+_THEME_COLORS = {
+    "dark": {
+        QPalette.ColorRole.Window: "#121212",
+        QPalette.ColorRole.WindowText: "#e0e0e0",
+        QPalette.ColorRole.Base: "#1e1e1e",
+        QPalette.ColorRole.AlternateBase: "#262626",
+        QPalette.ColorRole.Text: "#ddd",
+        QPalette.ColorRole.PlaceholderText: "#888",
+        QPalette.ColorRole.Button: "#333",
+        QPalette.ColorRole.ButtonText: "#fff",
+        QPalette.ColorRole.BrightText: "#ff6b6b",
+        QPalette.ColorRole.Light: "#484848",
+        QPalette.ColorRole.Midlight: "#3c3c3c",
+        QPalette.ColorRole.Mid: "#555",
+        QPalette.ColorRole.Dark: "#0a0a0a",
+        QPalette.ColorRole.Shadow: "#000",
+        QPalette.ColorRole.Highlight: "#2f65ca",
+        QPalette.ColorRole.HighlightedText: "#fff",
+        QPalette.ColorRole.Link: "#6ea8fe",
+        QPalette.ColorRole.LinkVisited: "#b59cff",
+        QPalette.ColorRole.ToolTipBase: "#333",
+        QPalette.ColorRole.ToolTipText: "#e0e0e0",
+    },
+    "light": {
+        QPalette.ColorRole.Window: "#f8f9fb",
+        QPalette.ColorRole.WindowText: "#111",
+        QPalette.ColorRole.Base: "#fff",
+        QPalette.ColorRole.AlternateBase: "#f0f1f4",
+        QPalette.ColorRole.Text: "#111",
+        QPalette.ColorRole.PlaceholderText: "#888",
+        QPalette.ColorRole.Button: "#fff",
+        QPalette.ColorRole.ButtonText: "#111",
+        QPalette.ColorRole.BrightText: "#d00",
+        QPalette.ColorRole.Light: "#fff",
+        QPalette.ColorRole.Midlight: "#eee",
+        QPalette.ColorRole.Mid: "#ccc",
+        QPalette.ColorRole.Dark: "#999",
+        QPalette.ColorRole.Shadow: "#555",
+        QPalette.ColorRole.Highlight: "#2f65ca",
+        QPalette.ColorRole.HighlightedText: "#fff",
+        QPalette.ColorRole.Link: "#0b57d0",
+        QPalette.ColorRole.LinkVisited: "#6a3fb5",
+        QPalette.ColorRole.ToolTipBase: "#ffffdc",
+        QPalette.ColorRole.ToolTipText: "#111",
+    },
+}
+
+# setColor(role, ...) applies to every colour group, so disabled widgets need their own
+# muted values to still look disabled.
+_THEME_DISABLED_COLORS = {
+    "dark": {
+        QPalette.ColorRole.WindowText: "#6f6f6f",
+        QPalette.ColorRole.Text: "#6f6f6f",
+        QPalette.ColorRole.ButtonText: "#6f6f6f",
+        QPalette.ColorRole.Button: "#262626",
+        QPalette.ColorRole.Base: "#181818",
+    },
+    "light": {
+        QPalette.ColorRole.WindowText: "#9a9a9a",
+        QPalette.ColorRole.Text: "#9a9a9a",
+        QPalette.ColorRole.ButtonText: "#9a9a9a",
+        QPalette.ColorRole.Button: "#f0f1f4",
+        QPalette.ColorRole.Base: "#f4f5f7",
+    },
+}
+
+# Colours come from the palette; QSS only covers what QPalette cannot express.
+_THEME_QSS = """
+#serverWindow QPushButton { background-color: palette(button); border: 1px solid palette(mid); border-radius:5px; padding:5px;}
+#serverWindow QLineEdit, #serverWindow QPlainTextEdit { border: 1px solid palette(mid);}
+#serverWindow QGroupBox { border: 1px solid palette(mid); margin-top:6px; padding:6px; }
+"""
+
+
+def _make_palette(theme):
+    palette = QApplication.style().standardPalette()
+    for role, color in _THEME_COLORS[theme].items():
+        palette.setColor(role, QColor(color))
+    for role, color in _THEME_DISABLED_COLORS[theme].items():
+        palette.setColor(QPalette.ColorGroup.Disabled, role, QColor(color))
+    return palette
+
+
+_TRAY_ICON = None
+
+
+def _tray_icon():
+    global _TRAY_ICON
+    if _TRAY_ICON is None:
+        _TRAY_ICON = QApplication.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon)
+    return _TRAY_ICON
+
+
+class FolderCheckSignals(QObject):
+    done = pyqtSignal(str, bool)
+
+
+class FolderCheck(QRunnable):
+    """Checks that a folder exists off the GUI thread; slow network shares can stall stat()."""
+    def __init__(self, folder):
+        super().__init__()
+        self.folder = folder
+        self.signals = FolderCheckSignals()
+
+    def run(self):
+        self.signals.done.emit(self.folder, os.path.isdir(self.folder))
+
+
+class QrJobSignals(QObject):
+    result = pyqtSignal(str, QImage)
+
+
+class QrJob(QRunnable):
+    """Renders the QR code for a URL off the GUI thread."""
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self.signals = QrJobSignals()
+
+    def run(self):
+        image = generate_qr_image(self.url)
+        path = qr_cache_path(self.url)
+        try:
+            if save_image_atomic(image, path):
+                prune_qr_cache(path)
+        except OSError:
+            pass
+        self.signals.result.emit(self.url, image)
 
 
 class HttpServerGUI(QWidget):
@@ -20,21 +154,28 @@ class HttpServerGUI(QWidget):
         super().__init__()
         self.setWindowTitle("Simple HTTP File Server")
         self.setMinimumSize(850, 600)
-
-        self.manager = ServerManager()
-        self.log_queue = queue.Queue()
-        self.logger_thread = None
+        self.setObjectName("serverWindow")
+
+        self.manager = ServerManager(self)
+        self.manager.output.connect(self._on_server_output)
+        self.manager.exited.connect(self._on_server_exited)
+        self.manager.stopped.connect(self._on_server_stopped)
+        self.manager.started.connect(self._on_server_started)
+        self.manager.failed.connect(self._on_server_failed)
         self.server_running = False
         self._exiting = False
+        self._last_valid_folder = None
+        self._qr_cache: dict[str, QPixmap] = {}
+        self._palettes = {theme: _make_palette(theme) for theme in _THEME_COLORS}
+
+        # Install the theme before any child exists so widgets are polished once.
+        QApplication.instance().setStyleSheet(_THEME_QSS)
+        self._set_theme("light")
 
         self._build_ui()
         self._create_tray_icon()
 
-        self.log_timer = QTimer()
-        self.log_timer.timeout.connect(self._drain_log_queue)
-        self.log_timer.start(100)
-
-        self._apply_light_theme()
+        QTimer.singleShot(0, self._resolve_default_port)
 
     # ---------- UI ----------
     def _build_ui(self):
@@ -53,7 +194,7 @@ class HttpServerGUI(QWidget):
         tg_layout.addWidget(QLabel("Port:"), 1, 0)
         self.port_spin = QSpinBox()
         self.port_spin.setRange(1, 65535)
-        self.port_spin.setValue(find_free_port(8000))
+        self.port_spin.setValue(DEFAULT_PORT)
         auto_btn = QPushButton("Auto-detect")
         auto_btn.clicked.connect(self._auto_detect_port)
         tg_layout.addWidget(self.port_spin, 1, 1)
@@ -90,10 +231,11 @@ class HttpServerGUI(QWidget):
         mg_layout.addLayout(left_box)
 
         self.qr_label = QLabel(alignment=Qt.AlignmentFlag.AlignCenter)
-        self.qr_label.setMinimumSize(220, 220)
-        self.qr_label.setScaledContents(True)
+        # Fixed to the render size plus the 1 px border so QLabel never resamples
+        # the QR pixmap.
+        self.qr_label.setFixedSize(QR_SIZE + 2, QR_SIZE + 2)
         self.qr_label.setStyleSheet(
-            "border: 1px solid #444; border-radius: 8px; background-color: white;"
+            "border: 1px solid #444; border-radius: 8px; background-color: white; color: black;"
         )
         mg_layout.addWidget(self.qr_label, alignment=Qt.AlignmentFlag.AlignCenter)
         mid_group.setLayout(mg_layout)
@@ -102,8 +244,9 @@ class HttpServerGUI(QWidget):
         # Log viewer
         log_group = QGroupBox("Server Log")
         lg_layout = QVBoxLayout()
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(MAX_LOG_BLOCKS)
         lg_layout.addWidget(self.log_text)
 
         clear_btn = QPushButton("Clear Log")
@@ -121,86 +264,137 @@ class HttpServerGUI(QWidget):
         if folder:
             self.folder_line.setText(folder)
 
+    def _resolve_default_port(self):
+        if self.port_spin.value() == DEFAULT_PORT and not self.server_running:
+            self.port_spin.setValue(find_free_port(DEFAULT_PORT))
+
     def _auto_detect_port(self):
-        self.port_spin.setValue(find_free_port(8000))
+        self.port_spin.setValue(find_any_free_port())
 
     def _toggle_theme(self):
         if self.theme_btn.isChecked():
-            self._apply_dark_theme()
+            self._set_theme("dark")
             self.theme_btn.setText("Switch to Light")
         else:
-            self._apply_light_theme()
+            self._set_theme("light")
             self.theme_btn.setText("Switch to Dark")
 
-    def _apply_dark_theme(self):
-        self.setStyleSheet("""
-        QWidget { background-color: #121212; color: #e0e0e0; }
-        QPushButton { background-color: #333; color: #fff; border: 1px solid #555; border-radius:5px; padding:5px;}
-        QLineEdit, QTextEdit { background-color: #1e1e1e; color: #ddd; border: 1px solid #555;}
-        QGroupBox { border: 1px solid #555; margin-top:6px; padding:6px; }
-        """)
-
-    def _apply_light_theme(self):
-        self.setStyleSheet("""
-        QWidget { background-color: #f8f9fb; color: #111; }
-        QPushButton { background-color: #fff; border: 1px solid #ccc; border-radius:5px; padding:5px;}
-        QLineEdit, QTextEdit { background-color: #fff; color: #111; border: 1px solid #ccc;}
-        QGroupBox { border: 1px solid #ccc; margin-top:6px; padding:6px; }
-        """)
+    def _set_theme(self, theme):
+        QApplication.instance().setPalette(self._palettes[theme])
+        # palette() references in the stylesheet are resolved at polish time.
+        style = self.style()
+        for widget in (self, *self.findChildren(QWidget)):
+            style.unpolish(widget)
+            style.polish(widget)
+        self.update()
 
     def _start_server(self):
         folder = self.folder_line.text()
-        port = self.port_spin.value()
+        if folder == self._last_valid_folder:
+            self._launch_server(folder)
+            return
 
-        if not os.path.isdir(folder):
+        self.start_btn.setEnabled(False)
+        check = FolderCheck(folder)
+        check.signals.done.connect(self._on_folder_checked)
+        QThreadPool.globalInstance().start(check)
+
+    def _on_folder_checked(self, folder, is_dir):
+        if not is_dir:
+            self.start_btn.setEnabled(True)
             QMessageBox.warning(self, "Error", "Invalid folder path.")
             return
+        self._last_valid_folder = folder
+        self._launch_server(folder)
 
-        process = self.manager.start_server(folder, port)
-        if not process:
-            QMessageBox.critical(self, "Error", "Could not start server.")
-            return
+    def _launch_server(self, folder):
+        port = self.port_spin.value()
+        if not is_port_free(port):
+            port = find_free_port(port)
+            self.port_spin.setValue(port)
 
-        self.server_running = True
         self.start_btn.setEnabled(False)
+        self.status_label.setText("Status: Starting…")
+        self.manager.start_server(folder, port)
+
+    def _on_server_failed(self, error):
+        self._last_valid_folder = None
+        self.start_btn.setEnabled(True)
+        self.status_label.setText("Status: Stopped")
+        QMessageBox.critical(self, "Error", f"Could not start server.\n{error}")
+
+    def _on_server_started(self, port):
+        self.server_running = True
         self.stop_btn.setEnabled(True)
         self.status_label.setText(f"Status: Running on port {port}")
 
         local_ip = find_local_ip()
         url = f"http://{local_ip}:{port}/"
         self.url_display.setText(url)
-        pyperclip.copy(url)
+        QApplication.clipboard().setText(url)
         self.copy_note.setText("URL copied to clipboard")
-        self.qr_label.setPixmap(generate_qr_pixmap(url))
+        self._show_qr(url)
+
+        self.log_text.appendPlainText(f"[SYS] Server started at {url}")
+
+    def _show_qr(self, url):
+        pixmap = self._qr_cache.get(url)
+        if pixmap is None:
+            path = qr_cache_path(url)
+            if path.is_file():
+                pixmap = QPixmap(str(path))
+                if not pixmap.isNull():
+                    self._qr_cache[url] = pixmap
+        if pixmap is not None and not pixmap.isNull():
+            self.qr_label.setPixmap(pixmap)
+            return
+        self.qr_label.setText("Generating QR code…")
+        job = QrJob(url)
+        job.signals.result.connect(self._on_qr_ready)
+        QThreadPool.globalInstance().start(job)
 
-        self.logger_thread = ProcessLogger(process, self.log_queue)
-        self.logger_thread.start()
-        self.log_text.append(f"[SYS] Server started at {url}")
+    def _on_qr_ready(self, url, image):
+        pixmap = QPixmap.fromImage(image)
+        self._qr_cache[url] = pixmap
+        if url == self.url_display.text():
+            self.qr_label.setPixmap(pixmap)
 
     def _stop_server(self):
-        self.manager.stop_server()
+        if not self.server_running:
+            return
         self.server_running = False
+        self.stop_btn.setEnabled(False)
+        self.status_label.setText("Status: Stopping…")
+        self.manager.stop_server()
+
+    def _on_server_stopped(self):
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.status_label.setText("Status: Stopped")
-        self.log_text.append("[SYS] Server stopped.")
+        self.log_text.appendPlainText("[SYS] Server stopped.")
 
-    def _drain_log_queue(self):
-        while not self.log_queue.empty():
-            typ, line = self.log_queue.get()
-            self.log_text.append(f"[{typ}] {line}")
+    def _on_server_output(self, typ, text):
+        prefix = f"[{typ}] "
+        self.log_text.appendPlainText(prefix + text.replace("\n", "\n" + prefix))
+
+    def _on_server_exited(self, exit_code):
+        self.server_running = False
+        self.log_text.appendPlainText(f"[SYS] Server exited with code {exit_code}.")
+        self._on_server_stopped()
 
     # ---------- Tray ----------
     def _create_tray_icon(self):
         self.tray = QSystemTrayIcon(self)
-        icon = self.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon)
+        icon = _tray_icon()
         self.tray.setIcon(icon)
         self.setWindowIcon(icon)
 
-        menu = QMenu()
-        show_action = QAction("Show/Hide Window")
-        stop_action = QAction("Stop Server")
-        exit_action = QAction("Exit App")
+        # setContextMenu() does not take ownership, so keep the menu alive here
+        # and parent the actions to it.
+        self.tray_menu = menu = QMenu(self)
+        show_action = QAction("Show/Hide Window", menu)
+        stop_action = QAction("Stop Server", menu)
+        exit_action = QAction("Exit App", menu)
 
         show_action.triggered.connect(self._toggle_window)
         stop_action.triggered.connect(self._stop_server)
@@ -237,6 +431,5 @@ class HttpServerGUI(QWidget):
         )
 
     def _exit_app(self):
-        if self.server_running:
-            self.manager.stop_server()
+        self.manager.shutdown()
         sys.exit(0)
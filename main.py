@@ -1,12 +1,26 @@
 #!/usr/bin/env python3
+import os
 import sys
 import signal
 from PyQt6.QtWidgets import QApplication
 from gui import HttpServerGUI
 
 
+def _style_overridden(argv):
+    return bool(os.environ.get("QT_STYLE_OVERRIDE")) or any(
+        arg in ("-style", "--style") or arg.startswith(("-style=", "--style="))
+        for arg in argv[1:]
+    )
+
+
 def main():
+    style_overridden = _style_overridden(sys.argv)
     app = QApplication(sys.argv)
+    app.setApplicationName("LocalServe")
+    # Native styles (windowsvista, macOS) ignore much of the palette for spin
+    # boxes, scroll bars and menus; Fusion draws everything from it.
+    if not style_overridden:
+        app.setStyle("Fusion")
     win = HttpServerGUI()
     win.show()
 
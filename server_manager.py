@@ -1,34 +1,110 @@
 import sys
-import subprocess
-from utils import find_free_port, is_port_free
+from functools import partial
+from PyQt6.QtCore import QObject, QProcess, QTimer, pyqtSignal
 
 
-class ServerManager:
-    def __init__(self):
+KILL_TIMEOUT_MS = 2000
+
+
+class ServerManager(QObject):
+    """Runs http.server in a QProcess and emits its output as (tag, text) blocks of whole lines."""
+    output = pyqtSignal(str, str)
+    started = pyqtSignal(int)
+    failed = pyqtSignal(str)
+    exited = pyqtSignal(int)
+    stopped = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
         self.process = None
+        self._stopping = None
 
     def start_server(self, folder, port):
-        if not is_port_free(port):
-            port = find_free_port(8000)
-
-        cmd = [sys.executable, "-m", "http.server", str(port), "--bind", "0.0.0.0"]
-
-        try:
-            self.process = subprocess.Popen(
-                cmd,
-                cwd=folder,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-            )
-            return self.process
-        except Exception as e:
-            print("Error starting server:", e)
-            return None
+        process = QProcess(self)
+        process.setWorkingDirectory(folder)
+        process.setProgram(sys.executable)
+        process.setArguments(["-m", "http.server", str(port), "--bind", "0.0.0.0"])
+        # Partial-line buffers belong to this process, so a server that is still
+        # stopping cannot mix its output into the next one's.
+        pending = {"OUT": bytearray(), "ERR": bytearray()}
+        process.readyReadStandardOutput.connect(
+            partial(self._read_output, process.readAllStandardOutput, "OUT", pending["OUT"]))
+        process.readyReadStandardError.connect(
+            partial(self._read_output, process.readAllStandardError, "ERR", pending["ERR"]))
+        process.finished.connect(partial(self._on_finished, process, pending))
+        process.started.connect(partial(self._on_started, process, port))
+        process.errorOccurred.connect(partial(self._on_error, process))
+        self.process = process
+        process.start()
 
     def stop_server(self):
-        if self.process:
-            self.process.terminate()
-            self.process.wait(timeout=2)
+        if not self.process:
+            return
+        process, self.process = self.process, None
+        self._stopping = process
+        self._terminate(process)
+        # Parented to the process so it dies with it if the process exits first.
+        kill_timer = QTimer(process)
+        kill_timer.setSingleShot(True)
+        kill_timer.timeout.connect(process.kill)
+        kill_timer.start(KILL_TIMEOUT_MS)
+
+    def shutdown(self):
+        """Blocks until both the running and any still-stopping process have exited."""
+        for process in (self.process, self._stopping):
+            if process is None or process.state() == QProcess.ProcessState.NotRunning:
+                continue
+            self._terminate(process)
+            if not process.waitForFinished(KILL_TIMEOUT_MS):
+                process.kill()
+                process.waitForFinished(1000)
+
+    def _terminate(self, process):
+        # Windows console processes ignore the WM_CLOSE sent by terminate().
+        if sys.platform == "win32":
+            process.kill()
+        else:
+            process.terminate()
+
+    def _read_output(self, read_all, tag, pending):
+        pending += read_all().data()
+        end = pending.rfind(b"\n")
+        if end < 0:
+            return
+        self._emit_output(tag, pending[:end])
+        del pending[:end + 1]
+
+    def _flush_output(self, pending_by_tag):
+        for tag, pending in pending_by_tag.items():
+            if pending:
+                self._emit_output(tag, pending)
+                pending.clear()
+
+    def _emit_output(self, tag, data):
+        text = data.decode("utf-8", errors="replace")
+        if sys.platform == "win32":
+            text = text.replace("\r", "")
+        self.output.emit(tag, text)
+
+    def _on_started(self, process, port):
+        if process is self.process:
+            self.started.emit(port)
+
+    def _on_error(self, process, error):
+        if error != QProcess.ProcessError.FailedToStart or process is not self.process:
+            return
+        message = process.errorString()
+        print("Error starting server:", message)
+        self.process = None
+        process.deleteLater()
+        self.failed.emit(message)
+
+    def _on_finished(self, process, pending, exit_code, _exit_status):
+        self._flush_output(pending)
+        process.deleteLater()
+        if process is self.process:
             self.process = None
+            self.exited.emit(exit_code)
+        elif process is self._stopping:
+            self._stopping = None
+            self.stopped.emit()
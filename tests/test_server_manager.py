@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("PyQt6.QtCore")
+
+from PyQt6.QtCore import QByteArray  # noqa: E402
+from server_manager import ServerManager  # noqa: E402
+
+
+def _feed(manager, tag, pending, chunk):
+    manager._read_output(lambda: QByteArray(chunk), tag, pending[tag])
+
+
+def test_split_reads_are_emitted_as_whole_lines():
+    manager = ServerManager()
+    emitted = []
+    manager.output.connect(lambda tag, text: emitted.append((tag, text)))
+    pending = {"OUT": bytearray(), "ERR": bytearray()}
+    accented = "café".encode("utf-8")
+
+    _feed(manager, "ERR", pending, b"GET / HTTP/1.1 200 " + accented[:-1])
+    assert emitted == []
+    _feed(manager, "ERR", pending, accented[-1:] + b"\nsecond\nthi")
+    _feed(manager, "OUT", pending, b"Serving HTTP on 0.0.0.0 port 8000")
+    _feed(manager, "ERR", pending, b"rd line\nno newline")
+    manager._flush_output(pending)
+
+    assert emitted == [
+        ("ERR", "GET / HTTP/1.1 200 café\nsecond"),
+        ("ERR", "third line"),
+        ("OUT", "Serving HTTP on 0.0.0.0 port 8000"),
+        ("ERR", "no newline"),
+    ]
+    assert pending == {"OUT": bytearray(), "ERR": bytearray()}
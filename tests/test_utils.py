@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("PyQt6.QtGui")
+qrcode = pytest.importorskip("qrcode")
+
+from PyQt6.QtGui import QColor  # noqa: E402
+from utils import (  # noqa: E402
+    QR_CACHE_VERSION, generate_qr_image, prune_qr_cache, qr_cache_path, save_image_atomic,
+)
+
+
+@pytest.mark.parametrize("url, size", [
+    ("http://192.168.0.2:8000/", 1),
+    ("http://192.168.0.2:8000/", 20),
+    ("http://192.168.0.2:8000/", 29),
+    ("http://192.168.0.2:8000/" + "a" * 1024, 240),
+], ids=["size-1", "size-20", "size-29", "long-url"])
+def test_generate_qr_image_matches_matrix_when_size_is_at_most_modules(url, size):
+    qr = qrcode.QRCode(version=1, border=2)
+    qr.add_data(url)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+
+    img = generate_qr_image(url, size)
+    # Churn the allocator so a dangling buffer would be overwritten.
+    junk = [bytes(4096) for _ in range(256)]
+    del junk
+
+    assert img.width() == img.height() == len(matrix)
+    black = QColor("black").rgb()
+    for y, row in enumerate(matrix):
+        for x, dark in enumerate(row):
+            assert (img.pixel(x, y) == black) == dark, (x, y)
+
+
+def test_qr_cache_path_is_keyed_by_size_and_version():
+    url = "http://192.168.0.2:8000/"
+    assert qr_cache_path(url, 240) != qr_cache_path(url, 120)
+    assert qr_cache_path(url, 240).name.startswith(f"qr-v{QR_CACHE_VERSION}-240-")
+
+
+def test_save_image_atomic_leaves_only_the_final_file(tmp_path):
+    path = tmp_path / "cache" / "qr.png"
+    assert save_image_atomic(generate_qr_image("http://192.168.0.2:8000/"), path)
+    assert [p.name for p in path.parent.iterdir()] == ["qr.png"]
+
+
+def test_prune_qr_cache_keeps_only_the_last_written_file(tmp_path):
+    for name in ("qr-0123abcd.png", "qr-v1-240-aaaaaaaaaaaa.png", "qr-v1-240-bbbbbbbbbbbb.png"):
+        (tmp_path / name).write_bytes(b"")
+    (tmp_path / "notes.txt").write_bytes(b"")
+    keep = tmp_path / "qr-v1-240-cccccccccccc.png"
+    assert save_image_atomic(generate_qr_image("http://192.168.0.2:8000/"), keep)
+
+    prune_qr_cache(keep)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["notes.txt", keep.name]
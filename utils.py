@@ -1,11 +1,22 @@
+import os
 import socket
-from io import BytesIO
-from PIL import Image
-import qrcode
-from PyQt6.QtGui import QPixmap, QImage
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+from PyQt6.QtGui import QColor, QImage
+from PyQt6.QtCore import Qt, QStandardPaths
 
 
-def find_local_ip():
+LOCAL_IP_TTL = 30.0
+QR_SIZE = 240
+# Bump whenever generate_qr_image's output changes so stale cached PNGs are ignored.
+QR_CACHE_VERSION = 1
+
+_cached_ip = None
+
+
+def _probe_local_ip():
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
             s.connect(("8.8.8.8", 80))
@@ -14,8 +25,23 @@ def find_local_ip():
         return "127.0.0.1"
 
 
+def find_local_ip():
+    global _cached_ip
+    now = time.monotonic()
+    if _cached_ip is not None and now - _cached_ip[0] < LOCAL_IP_TTL:
+        return _cached_ip[1]
+    ip = _probe_local_ip()
+    _cached_ip = (now, ip)
+    return ip
+
+
 def is_port_free(port, host="0.0.0.0"):
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        # Match http.server, which binds with SO_REUSEADDR, so ports left in
+        # TIME_WAIT are not reported as busy. On Windows the option allows
+        # stealing a live port, so it is only set on POSIX.
+        if os.name == "posix":
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         try:
             s.bind((host, port))
             return True
@@ -23,20 +49,67 @@ def is_port_free(port, host="0.0.0.0"):
             return False
 
 
+def find_any_free_port(host="0.0.0.0"):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
 def find_free_port(start=8000, host="0.0.0.0"):
-    for port in range(start, 9000):
-        if is_port_free(port, host):
-            return port
-    raise RuntimeError("No free ports found in range 8000–9000.")
+    if is_port_free(start, host):
+        return start
+    return find_any_free_port(host)
 
 
-def generate_qr_pixmap(url: str, size: int = 240) -> QPixmap:
-    qr = qrcode.QRCode(version=1, box_size=6, border=2)
+def qr_cache_path(url: str, size: int = QR_SIZE) -> Path:
+    key = hashlib.sha1(url.encode()).hexdigest()[:12]
+    cache_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    return Path(cache_dir) / f"qr-v{QR_CACHE_VERSION}-{size}-{key}.png"
+
+
+def save_image_atomic(image: QImage, path: Path) -> bool:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.stem + "-", suffix=".tmp")
+    os.close(fd)
+    try:
+        if not image.save(tmp, "PNG"):
+            return False
+        os.replace(tmp, path)
+        return True
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def prune_qr_cache(keep: Path) -> None:
+    """Deletes every cached QR PNG except keep, so only the last-used URL stays on disk."""
+    for path in keep.parent.glob("qr-*.png"):
+        if path != keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def generate_qr_image(url: str, size: int = QR_SIZE) -> QImage:
+    import qrcode
+
+    qr = qrcode.QRCode(version=1, border=2)
     qr.add_data(url)
     qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
-    img = img.resize((size, size), Image.Resampling.LANCZOS)
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    qimg = QImage.fromData(buf.getvalue())
-    return QPixmap.fromImage(qimg)
+    matrix = qr.get_matrix()
+    modules = len(matrix)
+    px = max(1, size // modules)
+
+    # Format_Mono scanlines are MSB-first bits padded to 32-bit boundaries.
+    bytes_per_line = (modules + 31) // 32 * 4
+    data = b"".join(
+        int("".join("1" if dark else "0" for dark in row).ljust(bytes_per_line * 8, "0"), 2)
+        .to_bytes(bytes_per_line, "big")
+        for row in matrix
+    )
+    # copy() detaches from the local buffer; scaled() returns a shallow copy when px == 1.
+    img = QImage(data, modules, modules, bytes_per_line, QImage.Format.Format_Mono).copy()
+    img.setColorTable([QColor(Qt.GlobalColor.white).rgb(), QColor(Qt.GlobalColor.black).rgb()])
+    return img.scaled(modules * px, modules * px, Qt.AspectRatioMode.KeepAspectRatio,
+                      Qt.TransformationMode.FastTransformation)